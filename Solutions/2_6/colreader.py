@@ -2,6 +2,14 @@
 
 import collections
 import csv
+from array import array
+
+# Types stored in compact typed arrays instead of lists of objects
+_typecodes = { int: 'q', float: 'd' }
+
+def make_column(func):
+    typecode = _typecodes.get(func)
+    return array(typecode) if typecode else []
 
 class DataCollection(collections.abc.Sequence):
     def __init__(self, columns):
@@ -12,15 +20,17 @@ class DataCollection(collections.abc.Sequence):
         return len(self.column_data[0])
 
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ self[n] for n in range(*index.indices(len(self))) ]
         return dict(zip(self.column_names,
                         (col[index] for col in self.column_data)))
 
 
 def read_csv_as_columns(filename, types):
-    columns = collections.defaultdict(list)
     with open(filename) as f:
         rows = csv.reader(f)
         headers = next(rows)
+        columns = { name: make_column(func) for name, func in zip(headers, types) }
         for row in rows:
             for name, func, val in zip(headers, types, row):
                 columns[name].append(func(val))
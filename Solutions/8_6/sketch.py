@@ -0,0 +1,158 @@
+# sketch.py
+#
+# Bounded-memory summaries of a stream: approximate distinct counts
+# (HyperLogLog) and approximate frequencies / heavy hitters (Count-Min,
+# Space-Saving).  Each sketch has add() and update() methods, so it can
+# be fed from a generator pipeline via tap() or from a coroutine pipeline
+# via sketcher().
+
+from array import array
+from hashlib import blake2b
+import math
+
+from cofollow import consumer, receive
+
+def hash64(item):
+    '''
+    Stable 64-bit hash of an item (unlike hash(), the same in every process)
+    '''
+    return int.from_bytes(blake2b(repr(item).encode(), digest_size=8).digest(), 'little')
+
+class HyperLogLog:
+    '''
+    Approximate count of distinct items using 2**p one-byte registers.
+    The standard error is about 1.04/sqrt(2**p), 0.8% for p=14.
+    '''
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+
+    def add(self, item):
+        h = hash64(item)
+        index = h & (self.m - 1)
+        rest = h >> self.p
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return round(self.count())
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+class CountMin:
+    '''
+    Approximate item frequencies in a depth x width table of counters.
+    Estimates never undercount and overcount by at most about
+    2/width of the total with probability 1 - 0.5**depth.
+    '''
+    def __init__(self, width=2048, depth=5):
+        self.width = width
+        self.depth = depth
+        self.tables = [ array('q', bytes(8 * width)) for _ in range(depth) ]
+        self.total = 0
+
+    def _columns(self, item):
+        h = hash64(item)
+        h1, h2 = h & 0xffffffff, h >> 32
+        return [ (h1 + i * h2) % self.width for i in range(self.depth) ]
+
+    def add(self, item, count=1):
+        for table, col in zip(self.tables, self._columns(item)):
+            table[col] += count
+        self.total += count
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def __getitem__(self, item):
+        return min(table[col] for table, col in zip(self.tables, self._columns(item)))
+
+class SpaceSaving:
+    '''
+    Heavy hitters with at most k counters.  Any item occurring more than
+    total/k times is guaranteed to be tracked; its count is overestimated
+    by at most the error recorded with it.
+    '''
+    def __init__(self, k=100):
+        self.k = k
+        self.counts = { }
+        self.errors = { }
+
+    def add(self, item, count=1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.k:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter, inheriting its count as error
+            victim = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(victim)
+            del self.errors[victim]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def most_common(self, n=None):
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return items if n is None else items[:n]
+
+# Plugging sketches into pipelines
+
+def tap(items, sketch, key=lambda item: item):
+    '''
+    Generator that feeds key(item) to a sketch as items flow through
+    '''
+    for item in items:
+        sketch.add(key(item))
+        yield item
+
+@consumer
+def sketcher(sketch, key=lambda item: item, target=None):
+    '''
+    Coroutine that feeds key(item) to a sketch and passes items on to target
+    '''
+    while True:
+        item = yield from receive(object)
+        sketch.add(key(item))
+        if target is not None:
+            target.send(item)
+
+# Example use
+if __name__ == '__main__':
+    from cofollow import follow
+    from coticker import to_csv, create_ticker, negchange
+
+    names = HyperLogLog()
+    movers = SpaceSaving(10)
+
+    @consumer
+    def report():
+        while True:
+            rec = yield from receive(object)
+            print('%d distinct names, top losers %s' % (len(names), movers.most_common(3)))
+
+    follow('../../Data/stocklog.csv',
+           to_csv(
+           create_ticker(
+           sketcher(names, lambda rec: rec.name,
+           negchange(
+           sketcher(movers, lambda rec: rec.name,
+           report()))))))
@@ -0,0 +1,39 @@
+# compressed.py
+#
+# Transparent reading of compressed files.  A deliberate copy of
+# src/compressed.py, since structly has to stay a standalone package.
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+BUFFER_SIZE = 1 << 20
+
+_openers_by_suffix = { '.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open, '.lzma': lzma.open }
+_openers_by_magic = { b'\x1f\x8b': gzip.open, b'BZh': bz2.open, b'\xfd7zXZ\x00': lzma.open }
+
+def compressed_opener(filename):
+    '''
+    Return the gzip/bz2/lzma open function for a file (by extension or
+    magic bytes) or None if it isn't compressed
+    '''
+    opener = _openers_by_suffix.get(os.path.splitext(filename)[1].lower())
+    if opener is None:
+        with open(filename, 'rb') as file:
+            head = file.read(6)
+        for magic, func in _openers_by_magic.items():
+            if head.startswith(magic):
+                return func
+    return opener
+
+def open_text(filename, encoding=None, buffer_size=BUFFER_SIZE):
+    '''
+    Open a plain or compressed text file for reading.  Compressed data is
+    decompressed incrementally as it's read.
+    '''
+    opener = compressed_opener(filename)
+    if opener is None:
+        return open(filename, encoding=encoding, buffering=buffer_size)
+    return io.TextIOWrapper(io.BufferedReader(opener(filename, 'rb'), buffer_size), encoding=encoding)
@@ -0,0 +1,60 @@
+# extsort.py
+
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+
+# Records per pickled block within a run file
+BLOCK_SIZE = 1024
+
+# Most runs merged at once (each one holds an open file)
+MAX_RUNS = 64
+
+def _spill(records):
+    '''
+    Write sorted records to an anonymous temporary file in pickled blocks
+    '''
+    file = tempfile.TemporaryFile()
+    records = iter(records)
+    while block := list(islice(records, BLOCK_SIZE)):
+        pickle.dump(block, file, pickle.HIGHEST_PROTOCOL)
+    file.seek(0)
+    return file
+
+def _read_run(file):
+    with file:
+        while True:
+            try:
+                block = pickle.load(file)
+            except EOFError:
+                return
+            yield from block
+
+def _merge(runs, key, reverse):
+    return heapq.merge(*map(_read_run, runs), key=key, reverse=reverse)
+
+def external_sort(records, key=None, reverse=False, run_size=100_000):
+    '''
+    Generator producing records in sorted order while holding at most
+    run_size of them in memory.  Sorted runs are spilled to temporary
+    files in pickled blocks and then k-way merged, MAX_RUNS at a time.
+    Like sorted(), the sort is stable.
+    '''
+    records = iter(records)
+    runs = []
+    while True:
+        chunk = list(islice(records, run_size))
+        chunk.sort(key=key, reverse=reverse)
+        if not runs and len(chunk) < run_size:
+            # Everything fit in memory, nothing to spill
+            yield from chunk
+            return
+        if chunk:
+            runs.append(_spill(chunk))
+        if len(runs) == MAX_RUNS:
+            runs = [ _spill(_merge(runs, key, reverse)) ]
+        if len(chunk) < run_size:
+            break
+        del chunk
+    yield from _merge(runs, key, reverse)
@@ -1,43 +1,118 @@
 # reader.py
 
+__all__ = [ 'read_csv_as_dicts', 'read_csv_as_instances',
+            'iter_csv_as_dicts', 'iter_csv_as_instances',
+            'sorted_csv_as_dicts', 'sorted_csv_as_instances' ]
+
 import csv
 import logging
 
+from .compressed import open_text
+from .extsort import external_sort
+
 log = logging.getLogger(__name__)
 
-def convert_csv(lines, converter, *, headers=None):
+def select_columns(headers, rows, columns):
+    '''
+    Restrict headers and rows to the named columns
+    '''
+    indices = [ headers.index(name) for name in columns ]
+    return list(columns), ([ row[i] for i in indices ] for row in rows)
+
+def iter_convert_csv(lines, converter, *, headers=None, columns=None, where=None, filter=None):
+    '''
+    Generator that converts CSV lines one record at a time. If columns
+    is given, only those columns are passed on to the converter.
+
+    where(row) is tested on the raw list of strings before conversion and
+    filter(record) on the converted record. Rows failing either are dropped.
+    '''
     rows = csv.reader(lines)
     if headers is None:
         headers = next(rows)
+    if columns is not None:
+        headers, rows = select_columns(headers, rows, columns)
 
-    records = []
     for rowno, row in enumerate(rows, start=1):
+        if where is not None and not where(row):
+            continue
         try:
-            records.append(converter(headers, row))
+            record = converter(headers, row)
         except ValueError as e:
             log.warning('Row %s: Bad row: %s', rowno, row)
             log.debug('Row %s: Reason: %s', rowno, row)
-    return records
+            continue
+        if filter is None or filter(record):
+            yield record
+
+def convert_csv(lines, converter, *, headers=None, columns=None, where=None, filter=None):
+    return list(iter_convert_csv(lines, converter, headers=headers, columns=columns,
+                                 where=where, filter=filter))
+
+def _dict_converter(types):
+    return lambda headers, row: { name: func(val) for name, func, val in zip(headers, types, row) }
+
+def _instance_converter(cls):
+    return lambda headers, row: cls.from_row(row)
 
-def csv_as_dicts(lines, types, *, headers=None):
-    return convert_csv(lines, 
-                       lambda headers, row: { name: func(val) for name, func, val in zip(headers, types, row) })
+def csv_as_dicts(lines, types, *, headers=None, columns=None, where=None, filter=None):
+    return convert_csv(lines, _dict_converter(types), headers=headers, columns=columns,
+                       where=where, filter=filter)
 
-def csv_as_instances(lines, cls, *, headers=None):
-    return convert_csv(lines,
-                       lambda headers, row: cls.from_row(row))
+def csv_as_instances(lines, cls, *, headers=None, columns=None, where=None, filter=None):
+    return convert_csv(lines, _instance_converter(cls), headers=headers, columns=columns,
+                       where=where, filter=filter)
 
-def read_csv_as_dicts(filename, types, *, headers=None):
+def read_csv_as_dicts(filename, types, *, headers=None, columns=None, where=None, filter=None):
     '''
-    Read CSV data into a list of dictionaries with optional type conversion
+    Read CSV data into a list of dictionaries with optional type conversion.
+    If columns is given, types lists the conversion for each selected column.
     '''
-    with open(filename) as file:
-        return csv_as_dicts(file, types, headers=headers)
+    with open_text(filename) as file:
+        return csv_as_dicts(file, types, headers=headers, columns=columns,
+                            where=where, filter=filter)
 
-def read_csv_as_instances(filename, cls, *, headers=None):
+def read_csv_as_instances(filename, cls, *, headers=None, columns=None, where=None, filter=None):
     '''
-    Read CSV data into a list of instances
+    Read CSV data into a list of instances. If columns is given, they
+    are passed to cls.from_row in that order.
     '''
-    with open(filename) as file:
-        return csv_as_instances(file, cls, headers=headers)
+    with open_text(filename) as file:
+        return csv_as_instances(file, cls, headers=headers, columns=columns,
+                                where=where, filter=filter)
 
+def iter_csv_as_dicts(filename, types, *, headers=None, columns=None, where=None, filter=None):
+    '''
+    Lazily read CSV data as dictionaries, producing one record at a time
+    '''
+    with open_text(filename) as file:
+        yield from iter_convert_csv(file, _dict_converter(types), headers=headers, columns=columns,
+                                    where=where, filter=filter)
+
+def iter_csv_as_instances(filename, cls, *, headers=None, columns=None, where=None, filter=None):
+    '''
+    Lazily read CSV data as instances, producing one record at a time
+    '''
+    with open_text(filename) as file:
+        yield from iter_convert_csv(file, _instance_converter(cls), headers=headers, columns=columns,
+                                    where=where, filter=filter)
+
+def sorted_csv_as_dicts(filename, types, *, key=None, reverse=False, run_size=100_000,
+                        headers=None, columns=None, where=None, filter=None):
+    '''
+    Read CSV data as dictionaries in sorted order, holding at most
+    run_size records in memory at once
+    '''
+    records = iter_csv_as_dicts(filename, types, headers=headers, columns=columns,
+                                where=where, filter=filter)
+    yield from external_sort(records, key, reverse, run_size)
+
+def sorted_csv_as_instances(filename, cls, *, key=None, reverse=False, run_size=100_000,
+                            headers=None, columns=None, where=None, filter=None):
+    '''
+    Read CSV data as instances in sorted order, holding at most
+    run_size records in memory at once
+    '''
+    records = iter_csv_as_instances(filename, cls, headers=headers, columns=columns,
+                                    where=where, filter=filter)
+    yield from external_sort(records, key, reverse, run_size)
@@ -7,17 +7,44 @@ from collections import ChainMap
 
 class StructureMeta(type):
     @classmethod
-    def __prepare__(meta, clsname, bases):
+    def __prepare__(meta, clsname, bases, **kwargs):
         return ChainMap({}, Validator.validators)
         
     @staticmethod
-    def __new__(meta, name, bases, methods):
+    def __new__(meta, name, bases, methods, slots=False):
         methods = methods.maps[0]
+        if slots:
+            # The validators make way for slots of the same names and are
+            # kept in _validators, which _slot_setattr dispatches to
+            validators = { key: val for key, val in methods.items() if isinstance(val, Validator) }
+            methods = { key: val for key, val in methods.items() if key not in validators }
+            for key, val in validators.items():
+                val.__set_name__(None, key)
+            methods['__slots__'] = tuple(validators)
+            methods['_validators'] = validators
+            methods.setdefault('__setattr__', _slot_setattr)
         return super().__new__(meta, name, bases, methods)
 
+def _slot_setattr(self, name, value):
+    '''
+    __setattr__ of slotted structures.  Validates the value and stores it
+    in the slot.
+    '''
+    validator = self._validators.get(name)
+    if validator is None:
+        raise AttributeError('No attribute %s' % name)
+    validator.__set__(self, value)
+
 class Structure(metaclass=StructureMeta):
+    '''
+    Base class of data structures defined by validators.  With
+    class Name(Structure, slots=True) instances have no __dict__ and hold
+    their values in slots.
+    '''
+    __slots__ = ()
     _fields = ()
     _types = ()
+    _validators = { }
 
     def __setattr__(self, name, value):
         if name.startswith('_') or name in self._fields:
@@ -44,15 +71,51 @@ class Structure(metaclass=StructureMeta):
     @classmethod
     def create_init(cls):
         '''
-        Create an __init__ method from _fields
+        Create an __init__ method from _fields.  The checks of each field's
+        validator are inlined and the values are stored straight into the
+        instance __dict__ (or slots), bypassing __setattr__ and Validator.__set__.
+        A failing check calls the validator's check() to raise its error.
         '''
         args = ','.join(cls._fields)
-        code = f'def __init__(self, {args}):\n'
+        body = ''
+        env = { }
         for name in cls._fields:
-            code += f'    self.{name} = {name}\n'
-        locs = { }
-        exec(code, locs)
-        cls.__init__ = locs['__init__']
+            validator = cls._validators.get(name) or getattr(cls, name, None)
+            if not isinstance(validator, Validator) or type(validator).__set__ is not Validator.__set__:
+                body += f'    self.{name} = {name}\n'
+                continue
+            if validator.slot is None:
+                store = f'    _dict[{name!r}] = {{}}\n'
+            else:
+                env[f'_{name}_slot'] = validator.slot.__set__
+                store = f'    _{name}_slot(self, {{}})\n'
+            env[f'_{name}_check'] = validator.check
+            condition = validator.inline_check(name, env)
+            if condition is None:
+                body += store.format(f'_{name}_check({name})')
+                continue
+            if condition:
+                body += f'    if {condition}:\n'
+                body += f'        _{name}_check({name})\n'
+            body += store.format(name)
+        code = f'def __init__(self, {args}):\n'
+        if '_dict[' in body:
+            code += '    _dict = self.__dict__\n'
+        code += body or '    pass\n'
+        exec(code, env)
+        cls.__init__ = env['__init__']
+
+    @classmethod
+    def create_from_row(cls):
+        '''
+        Create a from_row class method with the _types conversions inlined
+        '''
+        args = ','.join(f'_type{n}(row[{n}])' for n in range(len(cls._types)))
+        code = 'def from_row(cls, row):\n'
+        code += f'    return cls({args})\n'
+        env = { f'_type{n}': func for n, func in enumerate(cls._types) }
+        exec(code, env)
+        cls.from_row = classmethod(env['from_row'])
 
     @classmethod
     def __init_subclass__(cls):
@@ -64,7 +127,10 @@ def validate_attributes(cls):
     Class decorator that scans a class definition for Validators
     and builds a _fields variable that captures their definition order.
     '''
-    validators = []
+    validators = list(vars(cls).get('_validators', {}).values())
+    for val in validators:
+        val.slot = vars(cls)[val.name]
+
     for name, val in vars(cls).items():
         if isinstance(val, Validator):
             validators.append(val)
@@ -81,9 +147,12 @@ def validate_attributes(cls):
     cls._types = tuple([ getattr(v, 'expected_type', lambda x: x)
                    for v in validators ])
 
-    # Create the __init__ method
+    # Create the __init__ and from_row methods, keeping a from_row
+    # that the class defines itself
     if cls._fields:
         cls.create_init()
+        if 'from_row' not in vars(cls):
+            cls.create_from_row()
 
     
     return cls
@@ -1,6 +1,23 @@
 # validate.py
 
+from array import array
+import math
+from string import Formatter
+
 class Validator:
+    # Expression that is true exactly when check() rejects {value}.  Other
+    # {fields} name class attributes, e.g. {expected_type}.  A class that
+    # overrides check() without its own reject_source can't be inlined.
+    reject_source = ''
+
+    # True if, within one typed array, a check that accepts the smallest
+    # value accepts every value (see check_column).  Like reject_source,
+    # it must be set by each class that overrides check().
+    min_decides = True
+
+    # Slot descriptor holding the value in a slotted Structure
+    slot = None
+
     def __init__(self, name=None):
         self.name = name
 
@@ -11,8 +28,111 @@ class Validator:
     def check(cls, value):
         return value
 
+    @classmethod
+    def inline_check(cls, value, env):
+        '''
+        Flatten the check() chain across the MRO into a single expression
+        on the variable value that is true when the value is invalid.
+        Names it refers to are added to env.  Returns '' if there is
+        nothing to check and None if a check can't be inlined.
+        '''
+        conditions = [ ]
+        for base in cls.__mro__:
+            if 'check' not in vars(base):
+                continue
+            source = vars(base).get('reject_source')
+            if source is None:
+                return None
+            if not source:
+                continue
+            fields = { field: f'_{value}_{field}' for _, field, _, _ in Formatter().parse(source)
+                       if field and field != 'value' }
+            env.update((name, getattr(cls, field)) for field, name in fields.items())
+            conditions.append(source.format(value=value, **fields))
+        return ' or '.join(conditions)
+
+    @classmethod
+    def find_invalid(cls, values):
+        '''
+        Indices of the values in a sequence that check() rejects, found
+        in one pass with the checks inlined (see inline_check)
+        '''
+        if '_find_invalid' not in vars(cls):
+            env = { '_check': cls.check }
+            condition = cls.inline_check('value', env)
+            if condition is None:
+                code = 'def find_invalid(values):\n'
+                code += '    bad = [ ]\n'
+                code += '    for i, value in enumerate(values):\n'
+                code += '        try:\n'
+                code += '            _check(value)\n'
+                code += '        except (TypeError, ValueError):\n'
+                code += '            bad.append(i)\n'
+                code += '    return bad\n'
+            else:
+                # A value of the wrong kind can make the inlined test itself
+                # raise (e.g. 'x' < 0); then rescan, counting such rows as bad
+                condition = condition or False
+                code = 'def find_invalid(values):\n'
+                code += '    try:\n'
+                code += f'        return [ i for i, value in enumerate(values) if {condition} ]\n'
+                code += '    except (TypeError, ValueError):\n'
+                code += '        pass\n'
+                code += '    bad = [ ]\n'
+                code += '    for i, value in enumerate(values):\n'
+                code += '        try:\n'
+                code += f'            if {condition}:\n'
+                code += '                bad.append(i)\n'
+                code += '        except (TypeError, ValueError):\n'
+                code += '            bad.append(i)\n'
+                code += '    return bad\n'
+            exec(code, env)
+            cls._find_invalid = staticmethod(env['find_invalid'])
+        return cls._find_invalid(values)
+
+    @classmethod
+    def check_many(cls, values):
+        '''
+        Validate a whole sequence of values at once.  Raises the error
+        check() gives for the first bad value, noting the indices of all
+        of them (also left in the .indices attribute of the error).
+        '''
+        bad = cls.find_invalid(values)
+        if bad:
+            try:
+                cls.check(values[bad[0]])
+            except (TypeError, ValueError) as e:
+                shown = ', '.join(map(str, bad[:10])) + (', ...' if len(bad) > 10 else '')
+                err = type(e)(f'{e} at {len(bad)} rows: {shown}')
+                err.indices = bad
+                raise err from None
+        return values
+
+    @classmethod
+    def check_column(cls, column):
+        '''
+        check_many() for a column, with a shortcut for typed arrays: if
+        the checks allow it, validating the minimum covers the whole
+        array and the per-value pass is only made when it fails.
+        '''
+        if isinstance(column, (array, memoryview)) and len(column) and \
+           all(vars(base).get('min_decides', False) for base in cls.__mro__ if 'check' in vars(base)):
+            lowest = min(column)
+            # NaN compares false with everything, so min() can skip both it
+            # and the values below it.  Any NaN makes the sum NaN.
+            if not (isinstance(lowest, float) and math.isnan(sum(column))):
+                try:
+                    cls.check(lowest)
+                    return column
+                except (TypeError, ValueError):
+                    pass
+        return cls.check_many(column)
+
     def __set__(self, instance, value):
-        instance.__dict__[self.name] = self.check(value)
+        if self.slot is None:
+            instance.__dict__[self.name] = self.check(value)
+        else:
+            self.slot.__set__(instance, self.check(value))
 
     # Collect all derived classes into a dict
     validators = { }
@@ -22,6 +142,8 @@ class Validator:
 
 class Typed(Validator):
     expected_type = object
+    reject_source = 'not isinstance({value}, {expected_type})'
+    min_decides = True
     @classmethod
     def check(cls, value):
         if not isinstance(value, cls.expected_type):
@@ -37,6 +159,8 @@ globals().update((name, type(name, (Typed,), {'expected_type':ty}))
                  for name, ty in _typed_classes)
 
 class Positive(Validator):
+    reject_source = '{value} < 0'
+    min_decides = True
     @classmethod
     def check(cls, value):
         if value < 0:
@@ -44,6 +168,8 @@ class Positive(Validator):
         return super().check(value)
 
 class NonEmpty(Validator):
+    reject_source = 'len({value}) == 0'
+    min_decides = False
     @classmethod
     def check(cls, value):
         if len(value) == 0:
@@ -0,0 +1,9 @@
+"""Exercise solutions, laid out as one package.
+
+Modules share helpers through relative imports (e.g. ``..compressed``,
+``..exc_2_6.colcache``), so run them as modules from the repository root:
+
+    python -m src.exc_1_3.pcost
+    python -m src.exc_2_1.readrides bench
+    python -m src.exc_2_6.cta
+"""
@@ -0,0 +1,37 @@
+"""Transparent reading of gzip, bz2 and xz/lzma compressed files.
+
+Solutions/9_4/structly/compressed.py is a deliberate copy: structly is a
+standalone package and can't import from src.
+"""
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+
+BUFFER_SIZE = 1 << 20
+
+OPENERS_BY_SUFFIX = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open, ".lzma": lzma.open}
+OPENERS_BY_MAGIC = {b"\x1f\x8b": gzip.open, b"BZh": bz2.open, b"\xfd7zXZ\x00": lzma.open}
+
+
+def compressed_opener(path: str | Path):
+    """gzip/bz2/lzma open function for path by extension or magic bytes, else None."""
+    opener = OPENERS_BY_SUFFIX.get(Path(path).suffix.lower())
+    if opener is None:
+        with open(path, "rb") as f:
+            head = f.read(6)
+        opener = next((op for magic, op in OPENERS_BY_MAGIC.items() if head.startswith(magic)), None)
+    return opener
+
+
+def open_text(path: str | Path, encoding: str | None = None, buffer_size: int = BUFFER_SIZE) -> io.TextIOBase:
+    """Open a plain or compressed text file for reading.
+
+    Compressed input is decompressed incrementally as it is read, never
+    into memory as a whole, and both kinds are read through a large buffer.
+    """
+    opener = compressed_opener(path)
+    if opener is None:
+        return open(path, encoding=encoding, buffering=buffer_size)
+    return io.TextIOWrapper(io.BufferedReader(opener(path, "rb"), buffer_size), encoding=encoding)
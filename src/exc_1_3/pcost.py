@@ -1,5 +1,7 @@
 from pathlib import Path
 
+from ..compressed import open_text
+
 CUR_DIR = Path(__file__).parent
 DATA_DIR = CUR_DIR.parent.parent / "Data"
 VALID_DATA_PATH = DATA_DIR / "portfolio.dat"
@@ -9,7 +11,7 @@ ERROR_DATA_PATH = DATA_DIR / "portfolio3.dat"
 def portfolio_cost(filepath: Path) -> float:
 
     total = 0
-    with open(filepath, "r") as file_read:
+    with open_text(filepath) as file_read:
         for line in file_read:
             print(line)
             line_list = line.split()
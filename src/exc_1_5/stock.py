@@ -1,5 +1,7 @@
 import csv
 
+from ..compressed import open_text
+
 
 class Stock:
     _types = (str, int, float)
@@ -65,7 +67,7 @@ def read_portfolio(filepath: str, data_object: object) -> list[Stock]:
     if not hasattr(data_object, "from_row"):
         raise ValueError("Wrong object provided. No 'from_row' class method found.")
     data_records = []
-    with open(filepath) as file:
+    with open_text(filepath) as file:
         csv_file = csv.reader(file)
         next(csv_file)
         for row in csv_file:
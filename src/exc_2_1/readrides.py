@@ -1,12 +1,77 @@
+import argparse
 import collections
 import collections.abc
 import csv
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
 from pathlib import Path
 
+from ..compressed import open_text
+from ..exc_2_6 import colcache
+
 CURRENT_DIR = Path(__file__).parent
 DATA_DIR = CURRENT_DIR.parent.parent / "Data/ctabus.csv"
 
 
+class RideRow(collections.abc.Mapping):
+    """Read-only dict-like proxy for one row of a RideData."""
+    __slots__ = ("_data", "_index")
+
+    _columns = {"route": "routes", "date": "dates", "daytype": "daytypes", "rides": "numrides"}
+
+    def __init__(self, data: "RideData", index: int) -> None:
+        self._data = data
+        self._index = index
+
+    def __getitem__(self, key: str):
+        column = self._columns[key]
+        return getattr(self._data, column)[self._index]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __getattr__(self, name: str):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self):
+        return f"RideRow({dict(self)!r})"
+
+
+class RideDataView(collections.abc.Sequence):
+    """Slice of a RideData sharing its column lists, no rows are copied."""
+    __slots__ = ("_data", "_indices")
+
+    def __init__(self, data: "RideData", indices: range) -> None:
+        self._data = data
+        self._indices = indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, index) -> "RideRow | RideDataView":
+        if isinstance(index, slice):
+            return RideDataView(self._data, self._indices[index])
+        return RideRow(self._data, self._indices[index])
+
+    def __iter__(self):
+        data = self._data
+        for i in self._indices:
+            yield RideRow(data, i)
+
+
 class RideData(collections.abc.Sequence):
     def __init__(self) -> None:
         self.routes = []
@@ -17,31 +82,10 @@ class RideData(collections.abc.Sequence):
     def __len__(self):
         return len(self.routes)
     
-    def __getitem__(self, index) -> dict:
-
-        routes = self.routes[index]
-        dates = self.dates[index]
-        daytypes = self.daytypes[index]
-        numrides = self.numrides[index]
-        if len(routes) == 1:
-            return dict(
-                route=routes,
-                date=dates,
-                daytype=daytypes,
-                rides=numrides
-            )
-        else:
-            rows = []
-            for i in range(len(routes)):
-                rows.append(
-                    dict(
-                        route=routes[i],
-                        date=dates[i],
-                        daytype=daytypes[i],
-                        rides=numrides[i]
-                    )
-                )
-            return rows
+    def __getitem__(self, index) -> RideRow | RideDataView:
+        if isinstance(index, slice):
+            return RideDataView(self, range(len(self))[index])
+        return RideRow(self, range(len(self))[index])
     
     def append(self, d: dict):
         self.routes.append(d["route"])
@@ -52,9 +96,8 @@ class RideData(collections.abc.Sequence):
 
 def read_rides_as_tuples(filename: str) -> list[tuple]:
     """Read the bus ride data as a list of tuples."""
-    print("")
     records = []
-    with open(filename) as file:
+    with open_text(filename) as file:
         rows = csv.reader(file)
         next(rows)  # skip header
         for row in rows:
@@ -71,7 +114,7 @@ def read_rides_as_dict(filename: str) -> list[dict]:  # the worst efficient stor
     """Read the bus ride data as a list of dict."""
 
     records = RideData()
-    with open(filename) as file:
+    with open_text(filename) as file:
         rows = csv.reader(file)
         next(rows)  # skip header
         for row in rows:
@@ -100,7 +143,7 @@ def read_rides_as_class(filename: str) -> list:
             self.rides = rides
 
     records = []
-    with open(filename) as file:
+    with open_text(filename) as file:
         rows = csv.reader(file)
         next(rows)  # skip header
         for row in rows:
@@ -119,7 +162,7 @@ def read_rides_as_named_tuple(filename: str) -> list:
     Record = namedtuple("Record", ["route", "date", "daytype", "rides"])
 
     records = []
-    with open(filename) as file:
+    with open_text(filename) as file:
         rows = csv.reader(file)
         next(rows)  # skip header
         for row in rows:
@@ -145,7 +188,7 @@ def read_rides_as_slots_class(filename: str) -> list:  # the most efficient stor
             self.rides = rides
 
     records = []
-    with open(filename) as file:
+    with open_text(filename) as file:
         rows = csv.reader(file)
         next(rows)  # skip header
         for row in rows:
@@ -171,7 +214,7 @@ def read_rides_as_data_class(filename: str) -> list:
         rides: int
 
     records = []
-    with open(filename) as file:
+    with open_text(filename) as file:
         rows = csv.reader(file)
         next(rows)  # skip header
         for row in rows:
@@ -184,16 +227,27 @@ def read_rides_as_data_class(filename: str) -> list:
     return records
 
 
-def read_rides_as_columns(filename: str) -> list:
+RIDE_TYPES = [str, str, str, int]
+RIDE_COLUMNS = ["routes", "dates", "daytypes", "numrides"]
+
+
+def read_rides_as_columns(filename: str, cache: bool = False) -> dict:
     # more efficient than dicts because less memory alloc for 4 lists instead of thousands dicts
-    """Read the bus ride data as a list of Record instances with slots."""
+    """Read the bus ride data as a dict of columns.
+
+    With cache=True the columns are saved to, and later memory-mapped from,
+    a binary sidecar file next to the CSV. They are then always returned
+    read-only (CategoricalColumn and memoryview), cache hit or not.
+    """
+    if cache and (columns := colcache.load_columns(filename, RIDE_TYPES, RIDE_COLUMNS, tag="rides")):
+        return columns
 
     routes = []
     dates = []
     daytypes = []
     numrides = []
 
-    with open(filename) as file:
+    with open_text(filename) as file:
         rows = csv.reader(file)
         next(rows)  # skip header
         for row in rows:
@@ -201,14 +255,122 @@ def read_rides_as_columns(filename: str) -> list:
             dates.append(row[1])
             daytypes.append(row[2])
             numrides.append(int(row[3]))
-    return dict(routes=routes, dates=dates, daytypes=daytypes, numrides=numrides)
-
+    columns = dict(routes=routes, dates=dates, daytypes=daytypes, numrides=numrides)
+    if not cache:
+        return columns
+
+    columns["numrides"] = array("q", numrides)
+    try:
+        colcache.save_columns(filename, RIDE_TYPES, columns, tag="rides")
+    except OSError:
+        pass  # No writable sidecar, this read just isn't cached
+    return colcache.cached_form(columns)
+
+
+STRATEGIES = {
+    "tuples": read_rides_as_tuples,
+    "dict": read_rides_as_dict,
+    "class": read_rides_as_class,
+    "named_tuple": read_rides_as_named_tuple,
+    "slots_class": read_rides_as_slots_class,
+    "data_class": read_rides_as_data_class,
+    "columns": read_rides_as_columns,
+}
+
+
+def write_sample(source: str | Path, nrows: int, target: str | Path) -> int:
+    """Copy the header and the first nrows rows of source to target."""
+    with open_text(source) as src, open(target, "w") as dst:
+        dst.write(src.readline())
+        written = 0
+        for line in itertools.islice(src, nrows):
+            dst.write(line)
+            written += 1
+    return written
+
+
+def bench_strategy(func, filename: str | Path, nrows: int, repeat: int = 3) -> dict:
+    """Best-of-repeat wall time, then one traced run for memory use."""
+    wall_times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(filename)
+        wall_times.append(time.perf_counter() - start)
 
-if __name__ == "__main__":
-    import tracemalloc
     tracemalloc.start()
+    records = func(filename)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+
+    return {
+        "strategy": func.__name__,
+        "rows": nrows,
+        "wall_time": min(wall_times),
+        "current_memory": current,
+        "peak_memory": peak,
+        "bytes_per_record": current / nrows if nrows else 0.0,
+    }
+
+
+def run_benchmarks(
+    source: str | Path, row_counts: list[int], strategies: list[str], repeat: int = 3
+) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for count in row_counts:
+            sample = Path(tmpdir) / f"rides_{count}.csv"
+            nrows = write_sample(source, count, sample)
+            for name in strategies:
+                results.append(bench_strategy(STRATEGIES[name], sample, nrows, repeat))
+    return {
+        "source": os.path.abspath(source),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def print_report(report: dict) -> None:
+    print("%-28s %10s %10s %14s %14s %12s" % ("strategy", "rows", "time (s)", "current", "peak", "bytes/rec"))
+    print("-" * 93)
+    for r in report["results"]:
+        print(
+            "%-28s %10d %10.4f %14d %14d %12.1f"
+            % (r["strategy"], r["rows"], r["wall_time"], r["current_memory"], r["peak_memory"], r["bytes_per_record"])
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="readrides")
+    commands = parser.add_subparsers(dest="command")
+    bench = commands.add_parser("bench", help="benchmark every read_rides_as_* strategy")
+    bench.add_argument("--file", default=DATA_DIR, help="source CSV (default: %(default)s)")
+    bench.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    bench.add_argument("--strategy", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.add_argument("--json", help="write the JSON report to this file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    if args.command != "bench":
+        tracemalloc.start()
+        func = read_rides_as_dict
+        print(func.__name__)
+        rows = func(DATA_DIR)
+        print("Memory use current: Current %d, Peak %d" % tracemalloc.get_traced_memory())
+        return
+
+    report = run_benchmarks(args.file, args.rows, args.strategy, args.repeat)
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        return
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
 
-    func = read_rides_as_dict
-    print(func.__name__)
-    rows = func(DATA_DIR)
-    print("Memory use current: Current %d, Peak %d" % tracemalloc.get_traced_memory())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import csv
+import itertools
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from .readrides import DATA_DIR
+
+HOLIDAYS = {(1, 1), (7, 4), (12, 25)}
+DAYTYPE_FACTORS = {"W": 1.0, "A": 0.62, "U": 0.45}
+
+
+ROUTE_NUMBERS = range(1, 207)
+ROUTE_VARIANTS = ["{}A", "X{}", "{}W", "{}N", "R{}", "N{}", "{}B"]
+# Every number plain and in every variant
+MAX_ROUTES = len(ROUTE_NUMBERS) * (1 + len(ROUTE_VARIANTS))
+
+
+def check_routes(count: int) -> int:
+    if not 1 <= count <= MAX_ROUTES:
+        raise ValueError(f"routes must be between 1 and {MAX_ROUTES}, got {count}")
+    return count
+
+
+def make_routes(count: int, rng: random.Random) -> list[str]:
+    """Route names in the style of the CTA data: '22', '53A', 'X9', 'N201'..."""
+    check_routes(count)
+    numbers = rng.sample(ROUTE_NUMBERS, min(max(1, count * 4 // 5), len(ROUTE_NUMBERS)))
+    routes = {str(n) for n in numbers}
+    variants = itertools.cycle(ROUTE_VARIANTS)
+    while len(routes) < count:
+        routes.add(next(variants).format(rng.choice(numbers)))
+    return sorted(routes, key=lambda r: (len(r), r))
+
+
+def daytype(day: date) -> str:
+    if day.weekday() == 6 or (day.month, day.day) in HOLIDAYS:
+        return "U"
+    if day.weekday() == 5:
+        return "A"
+    return "W"
+
+
+def generate_rides(
+    nrows: int, seed: int = 0, routes: int = 180, start: date = date(2001, 1, 1)
+) -> Iterator[tuple[str, str, str, int]]:
+    """Deterministic (route, date, daytype, rides) rows, one day of routes at a time."""
+    rng = random.Random(seed)
+    names = make_routes(routes, rng)
+    base = [rng.lognormvariate(8.3, 1.1) for _ in names]
+    growth = [rng.uniform(-0.04, 0.04) for _ in names]
+
+    day = start
+    produced = 0
+    while produced < nrows:
+        date_str = day.strftime("%m/%d/%Y")
+        kind = daytype(day)
+        years = (day - start).days / 365.25
+        factor = DAYTYPE_FACTORS[kind]
+        for name, rides, trend in zip(names, base, growth):
+            if produced == nrows:
+                return
+            value = rides * factor * (1 + trend) ** years * rng.gauss(1.0, 0.08)
+            yield name, date_str, kind, max(0, int(value))
+            produced += 1
+        day += timedelta(days=1)
+
+
+def write_rides(filename: str | Path, nrows: int, seed: int = 0, routes: int = 180) -> int:
+    """Write a synthetic ctabus.csv with nrows rows and return the row count."""
+    check_routes(routes)
+    with open(filename, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["route", "date", "daytype", "rides"])
+        rows = generate_rides(nrows, seed, routes)
+        while batch := list(itertools.islice(rows, 100_000)):
+            writer.writerows(batch)
+    return nrows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="ridesim", description="Generate synthetic CTA bus ridership data")
+    parser.add_argument("rows", type=int, help="number of data rows to write")
+    parser.add_argument("-o", "--output", default=DATA_DIR, help="output CSV (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--routes", type=int, default=180)
+    args = parser.parse_args(argv)
+    try:
+        check_routes(args.routes)
+    except ValueError as e:
+        parser.error(str(e))
+    write_rides(args.output, args.rows, args.seed, args.routes)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
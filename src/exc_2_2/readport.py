@@ -203,10 +203,12 @@ A:
 
 import csv
 
+from ..compressed import open_text
+
 
 def read_portfolio(filename: str) -> list[dict]:
     portfolio = []
-    with open(filename) as f:
+    with open_text(filename) as f:
         rows = csv.reader(f)
         next(rows)  # skip header
         for row in rows:
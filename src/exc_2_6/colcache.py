@@ -0,0 +1,147 @@
+"""Binary sidecar cache of parsed columns, e.g. ctabus.csv.columns.colcache.
+
+The header records the source path, size, mtime, column types and column
+names, so a stale cache is ignored. Column buffers are memory-mapped on load
+and read-only.
+"""
+import json
+import mmap
+import os
+from array import array
+from pathlib import Path
+
+from .columns import CategoricalColumn
+
+MAGIC = b"COLCACHE1\n"
+SUFFIX = ".colcache"
+
+
+def cache_path(source: str | Path, tag: str = "columns") -> Path:
+    return Path(f"{source}.{tag}{SUFFIX}")
+
+
+def converter_key(func) -> str | None:
+    """Module-qualified name of a converter, or None if it has no stable name
+    (lambdas, functions defined in a function, partials, instances)."""
+    qualname = getattr(func, "__qualname__", None)
+    if qualname is None or "<" in qualname:
+        return None
+    return f"{func.__module__}.{qualname}"
+
+
+def cacheable(types: list) -> bool:
+    """Whether columns converted with types can be cached at all."""
+    return all(converter_key(func) is not None for func in types)
+
+
+def source_key(source: str | Path, types: list) -> dict:
+    stat = os.stat(source)
+    return {
+        "path": os.path.abspath(source),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "types": [converter_key(func) for func in types],
+    }
+
+
+def _encode(column) -> tuple[dict, bytes]:
+    if isinstance(column, array):
+        return {"kind": "array", "typecode": column.typecode}, column.tobytes()
+    if isinstance(column, CategoricalColumn):
+        codes = array("i", column.codes)
+        return {"kind": "categorical", "categories": column.categories}, codes.tobytes()
+    if all(isinstance(value, str) for value in column):
+        column = CategoricalColumn(column)
+        return {"kind": "categorical", "categories": column.categories}, column.codes.tobytes()
+    for value_type, typecode in ((int, "q"), (float, "d")):
+        if all(type(value) is value_type for value in column):
+            try:
+                column = array(typecode, column)
+            except OverflowError:
+                break
+            return {"kind": "array", "typecode": typecode}, column.tobytes()
+    raise TypeError(f"Can't cache a column of {type(column).__name__}")
+
+
+def _decode(info: dict, buffer: memoryview):
+    if info["kind"] == "array":
+        return buffer.cast(info["typecode"])
+    column = CategoricalColumn(info["categories"])
+    column.codes = buffer.cast("i")
+    return column
+
+
+def cached_form(columns: dict) -> dict:
+    """columns in the read-only form load_columns returns them in, without
+    touching the disk, for callers that must not depend on a cache hit."""
+    form = {}
+    for name, column in columns.items():
+        info, data = _encode(column)
+        form[name] = _decode(info, memoryview(data))
+    return form
+
+
+def save_columns(source: str | Path, types: list, columns: dict, tag: str = "columns") -> Path | None:
+    """Write columns to the sidecar cache of source.
+
+    Nothing is written (and None returned) if a converter in types has no
+    stable name, see converter_key. A column that can't be stored raises
+    TypeError.
+    """
+    if not cacheable(types):
+        return None
+    infos, buffers = [], []
+    offset = 0
+    for name, column in columns.items():
+        info, data = _encode(column)
+        info.update(name=name, offset=offset, nbytes=len(data))
+        padding = -len(data) % 8
+        infos.append(info)
+        buffers.append(data + bytes(padding))
+        offset += len(data) + padding
+
+    header = json.dumps({"source": source_key(source, types), "columns": infos}).encode()
+    header += b" " * (-len(MAGIC + header) % 8)
+
+    path = cache_path(source, tag)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for data in buffers:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def load_columns(source: str | Path, types: list, names: list[str], tag: str = "columns") -> dict | None:
+    """Memory-map the sidecar cache of source, or None if it is missing, stale
+    or holds a different set of columns than names."""
+    if not cacheable(types):
+        return None
+    path = cache_path(source, tag)
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(size))
+            if header["source"] != source_key(source, types):
+                return None
+            if [info["name"] for info in header["columns"]] != list(names):
+                return None
+            data_start = len(MAGIC) + 8 + size
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    view = memoryview(mapped)[data_start:]
+    return {
+        info["name"]: _decode(info, view[info["offset"]:info["offset"] + info["nbytes"]])
+        for info in header["columns"]
+    }
@@ -0,0 +1,115 @@
+import collections.abc
+from array import array
+from datetime import date
+from functools import lru_cache
+from itertools import compress, count
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def category(value: str) -> str:
+    """Column type marking a repetitive string column for dictionary encoding."""
+    return value
+
+
+@lru_cache(maxsize=1 << 16)
+def mdy_date(value: str) -> int:
+    """Column type for 'MM/DD/YYYY' dates, stored as days since 1970-01-01.
+
+    Parses are memoized since the same date repeats on every route.
+    """
+    month, day, year = value.split("/")
+    return date(int(year), int(month), int(day)).toordinal() - EPOCH_ORDINAL
+
+
+def civil_from_days(days: int) -> tuple[int, int, int]:
+    """(year, month, day) of a days-since-epoch value, in integer arithmetic only."""
+    z = days + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def year_of_days(days: int) -> int:
+    return civil_from_days(days)[0]
+
+
+def month_of_days(days: int) -> int:
+    return civil_from_days(days)[1]
+
+
+def days_to_mdy(days: int) -> str:
+    year, month, day = civil_from_days(days)
+    return f"{month:02d}/{day:02d}/{year}"
+
+
+ARRAY_TYPECODES = {int: "q", float: "d", mdy_date: "i"}
+
+
+class CategoricalColumn(collections.abc.Sequence):
+    """String column stored as integer codes into a table of unique values."""
+
+    def __init__(self, values=()) -> None:
+        self.codes = array("i")
+        self.categories = []
+        self._lookup = {}
+        self.extend(values)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self.categories[code] for code in self.codes[index]]
+        return self.categories[self.codes[index]]
+
+    def encode(self, value: str) -> int:
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def code_of(self, value: str) -> int | None:
+        return self._lookup.get(value)
+
+    def append(self, value: str):
+        self.codes.append(self.encode(value))
+
+    def extend(self, values):
+        self.codes.extend(map(self.encode, values))
+
+    def indices_of(self, value: str) -> list[int]:
+        """Row indices equal to value, compared on codes rather than strings."""
+        code = self._lookup.get(value)
+        if code is None:
+            return []
+        return list(compress(count(), map(code.__eq__, self.codes)))
+
+    def map_categories(self, func) -> "CategoricalColumn":
+        """New column of func(value), computed once per distinct value."""
+        column = CategoricalColumn()
+        table = array("i", map(column.encode, map(func, self.categories)))
+        column.codes = array("i", map(table.__getitem__, self.codes))
+        return column
+
+    def groups(self) -> dict[str, list[int]]:
+        """Row indices for every distinct value."""
+        indices = [[] for _ in self.categories]
+        for i, code in enumerate(self.codes):
+            indices[code].append(i)
+        return dict(zip(self.categories, indices))
+
+
+def make_column(column_type=None) -> array | list | CategoricalColumn:
+    """Storage for one column: a typed array for int/float/mdy_date, codes
+    for category, else a list."""
+    if column_type is category:
+        return CategoricalColumn()
+    typecode = ARRAY_TYPECODES.get(column_type)
+    return array(typecode) if typecode else []
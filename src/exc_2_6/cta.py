@@ -0,0 +1,36 @@
+import tracemalloc
+
+from .index import RouteDateIndex
+from .materialize import RideAggregates
+from .rides import DATA_PATH, load_rides
+from .topk import top_k
+
+
+if __name__ == "__main__":
+    tracemalloc.start()
+    aggregates = RideAggregates.open(DATA_PATH)
+
+    # Question 1: How many bus routes are in Chicago?
+    print(aggregates.route_count, "routes")
+
+    # Question 2: How many people rode route 22 on February 2, 2011?
+    rides = load_rides(DATA_PATH, cache=True, year=False)
+    by_route_date = RouteDateIndex.open(rides, DATA_PATH)
+    for row in by_route_date.rows("22", "02/02/2011"):
+        print("Rides on Route 22, February 2, 2011:", row["rides"])
+
+    # Question 3: Total number of rides per route
+    rides_per_route = aggregates.rides_per_route
+    for route, count in rides_per_route.most_common():
+        print("%5s %10d" % (route, count))
+
+    # Question 4: Routes with greatest increase in ridership 2001 - 2011
+    rides_by_year = aggregates.rides_by_year
+    diffs = (
+        (route, total - rides_by_year[2001][route])
+        for route, total in rides_by_year[2011].items()
+    )
+    for route, diff in top_k(diffs, 5, key=lambda item: item[1]):
+        print(route, diff)
+
+    print("Memory Use: Current %d, Peak %d" % tracemalloc.get_traced_memory())
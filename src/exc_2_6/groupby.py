@@ -0,0 +1,91 @@
+from array import array
+from collections import Counter
+
+from .columns import CategoricalColumn
+
+# Largest mixed-radix key space kept as a dense list of accumulators. Key
+# spaces larger than the number of rows are compacted to the keys present.
+DENSE_LIMIT = 1 << 22
+
+
+class GroupBy:
+    """Group rows of a DataCollection on one or more key columns.
+
+    Keys are reduced to one integer group id per row, using the codes of
+    categorical columns directly, and aggregates run over those ids in a
+    single loop. Results map each key value (a tuple for several keys) to
+    the aggregate.
+    """
+
+    def __init__(self, data, keys: tuple[str, ...]) -> None:
+        self.data = data
+        self.keys = keys
+        self.group_ids, self.group_keys = self._encode_keys()
+
+    def _encode_keys(self) -> tuple[array, list]:
+        columns = []
+        for name in self.keys:
+            column = self.data.columns[name]
+            if not isinstance(column, CategoricalColumn):
+                column = CategoricalColumn(column)
+            columns.append(column)
+
+        group_ids = columns[0].codes
+        radix = len(columns[0].categories)
+        for column in columns[1:]:
+            size = len(column.categories)
+            group_ids = array("q", [g * size + c for g, c in zip(group_ids, column.codes)])
+            radix *= size
+
+        if radix > min(DENSE_LIMIT, len(group_ids)):
+            # Sparse key space: renumber the combinations that occur
+            used = sorted(set(group_ids))
+            compact = {g: i for i, g in enumerate(used)}
+            group_ids = array("q", map(compact.__getitem__, group_ids))
+        else:
+            used = range(radix)
+
+        group_keys = []
+        for g in used:
+            key = []
+            for column in reversed(columns):
+                g, code = divmod(g, len(column.categories))
+                key.append(column.categories[code])
+            group_keys.append(key[0] if len(key) == 1 else tuple(reversed(key)))
+        return group_ids, group_keys
+
+    def _collect(self, accumulators: list) -> dict:
+        return {
+            key: value for key, value in zip(self.group_keys, accumulators) if value is not None
+        }
+
+    def count(self) -> Counter:
+        counts = Counter(self.group_ids)
+        return Counter({self.group_keys[g]: n for g, n in counts.items()})
+
+    def sum(self, column: str) -> Counter:
+        totals = [None] * len(self.group_keys)
+        for g, value in zip(self.group_ids, self.data.columns[column]):
+            total = totals[g]
+            totals[g] = value if total is None else total + value
+        return Counter(self._collect(totals))
+
+    def min(self, column: str) -> dict:
+        lowest = [None] * len(self.group_keys)
+        for g, value in zip(self.group_ids, self.data.columns[column]):
+            current = lowest[g]
+            if current is None or value < current:
+                lowest[g] = value
+        return self._collect(lowest)
+
+    def max(self, column: str) -> dict:
+        highest = [None] * len(self.group_keys)
+        for g, value in zip(self.group_ids, self.data.columns[column]):
+            current = highest[g]
+            if current is None or value > current:
+                highest[g] = value
+        return self._collect(highest)
+
+    def mean(self, column: str) -> dict:
+        counts = self.count()
+        return {key: total / counts[key] for key, total in self.sum(column).items()}
@@ -0,0 +1,97 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+
+from . import colcache
+from .columns import CategoricalColumn, mdy_date
+
+INDEX_TAG = "route_date_index"
+
+
+class RouteDateIndex:
+    """Point and range lookups on (route, date) over columnar ride data.
+
+    Only two arrays are kept: the row numbers sorted by (route, date) and the
+    offset of each route's run in that order. Lookups bisect inside a run.
+    """
+
+    def __init__(self, data, order: array, offsets: array, route: str = "route", date: str = "date") -> None:
+        self.data = data
+        self.order = order
+        self.offsets = offsets
+        self.routes = data.columns[route]
+        dates = data.columns[date]
+        if isinstance(dates, CategoricalColumn):
+            date_keys = array("q", map(mdy_date, dates.categories))
+            codes = dates.codes
+            self._date_key = lambda row: date_keys[codes[row]]
+        elif isinstance(dates, (array, memoryview)):
+            self._date_key = dates.__getitem__
+        else:
+            self._date_key = lambda row: mdy_date(dates[row])
+
+    @classmethod
+    def build(cls, data, route: str = "route", date: str = "date") -> "RouteDateIndex":
+        """Sort the rows by (route, date); a plain route column is dictionary-encoded in place."""
+        routes = data.columns[route]
+        if not isinstance(routes, CategoricalColumn):
+            routes = data.columns[route] = CategoricalColumn(routes)
+        index = cls(data, array("q"), array("q"), route, date)
+
+        date_key = index._date_key
+        keys = array("q", ((code << 32) + date_key(row) for row, code in enumerate(routes.codes)))
+        index.order = array("q", sorted(range(len(keys)), key=keys.__getitem__))
+        counts = Counter(routes.codes)
+        index.offsets = array("q", accumulate((counts[code] for code in range(len(routes.categories))), initial=0))
+        return index
+
+    def _run(self, route: str) -> tuple[int, int]:
+        code = self.routes.code_of(route)
+        if code is None:
+            return 0, 0
+        return self.offsets[code], self.offsets[code + 1]
+
+    def lookup(self, route: str, date: str) -> list[int]:
+        """Row numbers for route on date."""
+        return self.range(route, date, date)
+
+    def range(self, route: str, start: str, end: str) -> list[int]:
+        """Row numbers for route with start <= date <= end, in date order."""
+        lo, hi = self._run(route)
+        first = bisect_left(self.order, mdy_date(start), lo, hi, key=self._date_key)
+        last = bisect_right(self.order, mdy_date(end), first, hi, key=self._date_key)
+        return list(self.order[first:last])
+
+    def rows(self, route: str, start: str, end: str | None = None) -> list[dict]:
+        return [self.data[row] for row in self.range(route, start, end or start)]
+
+    def save(self, source: str | Path) -> Path:
+        """Persist the index next to source (see colcache)."""
+        columns = {"order": self.order, "offsets": self.offsets, "routes": self.routes.categories}
+        return colcache.save_columns(source, [], columns, tag=INDEX_TAG)
+
+    @classmethod
+    def load(cls, data, source: str | Path, route: str = "route", date: str = "date") -> "RouteDateIndex | None":
+        """The saved index of source, or None if it is missing or stale."""
+        columns = colcache.load_columns(source, [], ["order", "offsets", "routes"], tag=INDEX_TAG)
+        routes = data.columns[route]
+        if not columns or not isinstance(routes, CategoricalColumn):
+            return None
+        if list(columns["routes"]) != routes.categories or len(columns["order"]) != len(data):
+            return None
+        return cls(data, columns["order"], columns["offsets"], route, date)
+
+    @classmethod
+    def open(cls, data, source: str | Path, route: str = "route", date: str = "date") -> "RouteDateIndex":
+        """Load the saved index of source, building and saving it if needed
+        (an index that can't be saved is still returned)."""
+        index = cls.load(data, source, route, date)
+        if index is None:
+            index = cls.build(data, route, date)
+            try:
+                index.save(source)
+            except OSError:
+                pass
+        return index
@@ -0,0 +1,120 @@
+import collections.abc
+import csv
+import io
+import locale
+import mmap
+from pathlib import Path
+
+from ..compressed import compressed_opener
+from .columns import make_column
+from .reader import DataCollection
+from .rowindex import RowOffsetIndex, scan_line_offsets
+
+
+class LazyColumns(collections.abc.MutableMapping):
+    """Columns of a MappedDataCollection, converted on first access."""
+
+    def __init__(self, data: "MappedDataCollection") -> None:
+        self.data = data
+        self.loaded = {}
+        self.derived = {}
+
+    def __getitem__(self, name: str):
+        if name in self.derived:
+            return self.derived[name]
+        if name not in self.loaded:
+            self.load(name)
+        return self.loaded[name]
+
+    def load(self, *names: str) -> None:
+        """Convert several columns in a single pass over the file."""
+        missing = [name for name in names if name not in self.loaded and name not in self.derived]
+        if missing:
+            self.loaded.update(self.data.load_columns(missing))
+
+    def __setitem__(self, name: str, column) -> None:
+        self.derived[name] = column
+
+    def __delitem__(self, name: str) -> None:
+        del self.derived[name]
+
+    def __iter__(self):
+        yield from self.data.headers
+        yield from self.derived
+
+    def __len__(self):
+        return len(self.data.headers) + len(self.derived)
+
+
+class MappedDataCollection(DataCollection):
+    """Read-only DataCollection over a memory-mapped CSV file.
+
+    Opening it only scans the record offsets into an array('Q'), or with
+    index=True loads them from the sidecar RowOffsetIndex; fields are decoded
+    and converted when a row is indexed or a column is touched.
+    """
+
+    def __init__(
+        self, filename: str | Path, column_types: list, encoding: str | None = None, index: bool = False
+    ) -> None:
+        if compressed_opener(filename):
+            raise ValueError(f"{filename} is compressed and can't be memory-mapped")
+        with open(filename, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.filename = filename
+        # Like open() and the other readers, default to the locale encoding
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        offsets = RowOffsetIndex.open(filename).offsets if index else scan_line_offsets(self.buffer)
+        self.headers = self._parse(offsets[0], offsets[1])
+        self.offsets = offsets[1:]
+        self.column_types = column_types
+        self.columns = LazyColumns(self)
+
+    def _parse(self, start: int, end: int) -> list[str]:
+        return next(csv.reader([self.buffer[start:end].decode(self.encoding)]), [])
+
+    def fields(self, index: int) -> list[str]:
+        """Raw string fields of one row."""
+        return self._parse(self.offsets[index], self.offsets[index + 1])
+
+    def load_columns(self, names: list[str]) -> dict:
+        """Convert the named columns, parsing each row once."""
+        positions = [self.headers.index(name) for name in names]
+        funcs = [self.column_types[position] for position in positions]
+        columns = [make_column(func) for func in funcs]
+        with open(self.filename, "rb") as f:
+            f.seek(self.offsets[0])
+            rows = csv.reader(io.TextIOWrapper(f, self.encoding, newline=""))
+            for row in rows:
+                for column, func, position in zip(columns, funcs, positions):
+                    column.append(func(row[position]))
+        return dict(zip(names, columns))
+
+    def load_column(self, name: str):
+        return self.load_columns([name])[name]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index) -> dict | list[dict]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = range(len(self))[index]
+        record = {
+            name: func(val) for name, func, val in zip(self.headers, self.column_types, self.fields(index))
+        }
+        for name, column in self.columns.derived.items():
+            record[name] = column[index]
+        return record
+
+    def append(self, values: dict):
+        raise TypeError("MappedDataCollection is read-only")
+
+    def extend(self, columns: dict[str, list]):
+        raise TypeError("MappedDataCollection is read-only")
+
+
+def read_csv_as_mapped(
+    filepath: str | Path, column_types: list, index: bool = False, encoding: str | None = None
+) -> MappedDataCollection:
+    return MappedDataCollection(filepath, column_types, encoding, index)
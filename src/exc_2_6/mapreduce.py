@@ -0,0 +1,116 @@
+import csv
+import operator
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+from .reader import read_csv_range, split_csv
+
+MERGES = {"min": min, "max": max}
+
+
+def year_of(date: str) -> str:
+    """Key function for the year of an 'MM/DD/YYYY' date."""
+    return date[-4:]
+
+
+def _key_getter(headers: list[str], keys: list):
+    """Build row -> key from column names or (column, func) pairs."""
+    getters = []
+    for key in keys:
+        name, func = (key, None) if isinstance(key, str) else key
+        index = headers.index(name)
+        if func is None:
+            getters.append(operator.itemgetter(index))
+        else:
+            memo = {}
+
+            def getter(row, index=index, func=func, memo=memo):
+                value = row[index]
+                result = memo.get(value)
+                if result is None:
+                    result = memo[value] = func(value)
+                return result
+            getters.append(getter)
+
+    if len(getters) == 1:
+        return getters[0]
+    return lambda row: tuple(getter(row) for getter in getters)
+
+
+def aggregate_range(
+    filename: str,
+    headers: list[str],
+    start: int,
+    end: int,
+    keys: list,
+    value: str | None,
+    value_type,
+    how: str,
+    encoding: str | None = None,
+) -> dict:
+    """Partial aggregate of one byte range of the file."""
+    key_of = _key_getter(headers, keys)
+    rows = csv.reader(read_csv_range(filename, start, end, encoding))
+
+    if how == "count":
+        return Counter(map(key_of, rows))
+
+    value_index = headers.index(value)
+    if how == "sum":
+        totals = Counter()
+        for row in rows:
+            totals[key_of(row)] += value_type(row[value_index])
+        return totals
+
+    merge = MERGES[how]
+    partial = {}
+    for row in rows:
+        key = key_of(row)
+        val = value_type(row[value_index])
+        partial[key] = merge(partial[key], val) if key in partial else val
+    return partial
+
+
+def aggregate_csv(
+    filename: str | Path,
+    keys: list,
+    value: str | None = None,
+    how: str = "sum",
+    value_type=int,
+    max_workers: int | None = None,
+    encoding: str | None = None,
+) -> Counter | dict:
+    """Aggregate a CSV file by key in a process pool.
+
+    The file is split into line-aligned byte ranges, each worker computes a
+    partial aggregate of its range and the partials are merged here. keys
+    are column names or (column, func) pairs, e.g. [("date", year_of), "route"];
+    func must be picklable. how is one of sum, count, min or max.
+
+        >>> aggregate_csv("Data/ctabus.csv", ["route"], "rides")
+    """
+    if how not in ("sum", "count", *MERGES):
+        raise ValueError(f"Unknown aggregate {how!r}")
+
+    max_workers = max_workers or os.cpu_count()
+    headers, ranges = split_csv(filename, max_workers, encoding=encoding)
+    starts, ends = zip(*ranges) if ranges else ((), ())
+
+    result = Counter() if how in ("sum", "count") else {}
+    with ProcessPoolExecutor(max_workers) as pool:
+        partials = pool.map(
+            aggregate_range,
+            repeat(filename), repeat(headers), starts, ends,
+            repeat(keys), repeat(value), repeat(value_type), repeat(how), repeat(encoding),
+        )
+        for partial in partials:
+            if isinstance(result, Counter):
+                result.update(partial)
+                continue
+            merge = MERGES[how]
+            for key, val in partial.items():
+                result[key] = merge(result[key], val) if key in result else val
+    return result
@@ -0,0 +1,79 @@
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from . import colcache
+from .rides import load_rides
+
+AGGREGATES_TAG = "aggregates"
+AGGREGATE_COLUMNS = ["routes", "route_totals", "years", "year_routes", "year_totals"]
+
+
+class RideAggregates:
+    """Route count, per-route totals and per-year per-route totals of a
+    ride file, materialized once per version of the file.
+
+    The aggregates are stored next to the CSV through colcache, so they are
+    invalidated automatically when the file's size or mtime changes.
+    """
+
+    def __init__(self, rides_per_route: Counter, rides_by_year_route: Counter) -> None:
+        self.rides_per_route = rides_per_route
+        self.rides_by_year_route = rides_by_year_route
+
+    @property
+    def route_count(self) -> int:
+        return len(self.rides_per_route)
+
+    @property
+    def rides_by_year(self) -> defaultdict[int, Counter]:
+        by_year = defaultdict(Counter)
+        for (year, route), total in self.rides_by_year_route.items():
+            by_year[year][route] = total
+        return by_year
+
+    @classmethod
+    def compute(cls, data) -> "RideAggregates":
+        """Aggregate a DataCollection with route, year and rides columns."""
+        return cls(
+            data.group_by("route").sum("rides"),
+            data.group_by("year", "route").sum("rides"),
+        )
+
+    def save(self, source: str | Path) -> Path:
+        years, year_routes = zip(*self.rides_by_year_route) if self.rides_by_year_route else ((), ())
+        columns = {
+            "routes": list(self.rides_per_route),
+            "route_totals": array("q", self.rides_per_route.values()),
+            "years": array("q", years),
+            "year_routes": list(year_routes),
+            "year_totals": array("q", self.rides_by_year_route.values()),
+        }
+        return colcache.save_columns(source, [], columns, tag=AGGREGATES_TAG)
+
+    @classmethod
+    def load(cls, source: str | Path) -> "RideAggregates | None":
+        """The stored aggregates of source, or None if missing or stale."""
+        columns = colcache.load_columns(source, [], AGGREGATE_COLUMNS, tag=AGGREGATES_TAG)
+        if columns is None:
+            return None
+        return cls(
+            Counter(dict(zip(columns["routes"], columns["route_totals"]))),
+            Counter(dict(zip(zip(columns["years"], columns["year_routes"]), columns["year_totals"]))),
+        )
+
+    @classmethod
+    def open(cls, source: str | Path, data=None) -> "RideAggregates":
+        """Serve the stored aggregates of source, computing and storing them
+        first (from data, or by reading source through the column cache)
+        when needed."""
+        aggregates = cls.load(source)
+        if aggregates is None:
+            if data is None:
+                data = load_rides(source, cache=True)
+            aggregates = cls.compute(data)
+            try:
+                aggregates.save(source)
+            except OSError:
+                pass  # No writable sidecar, serve them unstored
+        return aggregates
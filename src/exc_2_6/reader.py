@@ -1,20 +1,163 @@
 import collections
 import csv
+import io
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, count, repeat
+
+from ..compressed import compressed_opener, open_text
+from . import colcache
+from .columns import CategoricalColumn, category, make_column
+from .groupby import GroupBy
+from .rowindex import BLOCK_SIZE, RowOffsetIndex
+
+
+def csv_chunk_offsets(filename: str, nchunks: int) -> list[int]:
+    """Split a CSV file into at most nchunks line-aligned byte ranges.
+
+    The first offset is the end of the header row and the last one is the
+    file size. Quote parity is tracked from the top of the file, so a newline
+    inside a quoted field is never chosen as a split point.
+    """
+    size = os.path.getsize(filename)
+    targets = [0] + [size * i // nchunks for i in range(1, nchunks)]
+    offsets = []
+    in_quotes = False
+    block_start = 0
+    with open(filename, "rb") as f:
+        while targets and (block := f.read(BLOCK_SIZE)):
+            pos = 0
+            while targets:
+                search_from = max(targets[0] - block_start, pos)
+                if search_from >= len(block):
+                    break
+                newline = block.find(b"\n", search_from)
+                if newline == -1:
+                    break
+                in_quotes ^= block.count(b'"', pos, newline) % 2 == 1
+                pos = newline + 1
+                if not in_quotes:
+                    offset = block_start + pos
+                    while targets and targets[0] < offset:
+                        targets.pop(0)
+                    offsets.append(offset)
+            in_quotes ^= block.count(b'"', pos) % 2 == 1
+            block_start += len(block)
+    offsets.append(size)
+    return sorted(set(offsets))
+
+
+def read_csv_range(filename: str, start: int, end: int, encoding: str | None = None) -> io.TextIOWrapper:
+    """Read the bytes [start, end) of a file as a text stream for csv.reader.
+
+    Like open(), encoding defaults to the locale encoding, so byte ranges
+    decode the same as the serial readers.
+    """
+    with open(filename, "rb") as f:
+        f.seek(start)
+        return io.TextIOWrapper(io.BytesIO(f.read(end - start)), encoding=encoding, newline="")
+
+
+def split_csv(
+    filename: str, nchunks: int, index: bool = False, encoding: str | None = None
+) -> tuple[list[str], list[tuple[int, int]]]:
+    """Return the CSV headers and the (start, end) byte range of each chunk.
+
+    With index=True the chunks come from the sidecar RowOffsetIndex and hold
+    equal numbers of rows instead of equal numbers of bytes.
+    """
+    if compressed_opener(filename):
+        raise ValueError(f"{filename} is compressed, byte ranges need a plain file")
+    if index:
+        row_index = RowOffsetIndex.open(filename)
+        headers = next(csv.reader(read_csv_range(filename, *row_index.header_range, encoding)))
+        return headers, row_index.split(nchunks)
+    offsets = csv_chunk_offsets(filename, nchunks)
+    headers = next(csv.reader(read_csv_range(filename, 0, offsets[0], encoding)))
+    return headers, list(zip(offsets, offsets[1:]))
+
+
+def select_columns(headers: list[str], rows, columns: list[str] | None = None):
+    """Restrict headers and rows to the named columns (all of them if None)."""
+    if columns is None:
+        return headers, rows
+    indices = [headers.index(name) for name in columns]
+    return list(columns), ([row[i] for i in indices] for row in rows)
+
+
+def row_bounds(rows: slice) -> tuple[int | None, int | None]:
+    """(start, stop) of a rows= slice; the row index can't skip rows."""
+    if rows.step not in (None, 1):
+        raise ValueError(f"rows slice can't have a step, got {rows.step}")
+    return rows.start, rows.stop
 
 
 class CSVParser(ABC):
 
-    def parse(self, filename: str):
+    def parse(self, filename: str, columns: list[str] | None = None, encoding: str | None = None):
         records = []
-        with open(filename) as f:
+        with open_text(filename, encoding) as f:
             rows = csv.reader(f)
-            headers = next(rows)
+            headers, rows = select_columns(next(rows), rows, columns)
             for row in rows:
                 record = self.make_record(headers, row)
                 records.append(record)
         return records
 
+    def parse_range(
+        self,
+        filename: str,
+        headers: list[str],
+        start: int,
+        end: int,
+        columns: list[str] | None = None,
+        encoding: str | None = None,
+    ) -> list:
+        rows = csv.reader(read_csv_range(filename, start, end, encoding))
+        headers, rows = select_columns(headers, rows, columns)
+        return [self.make_record(headers, row) for row in rows]
+
+    def parse_rows(
+        self,
+        filename: str,
+        start: int,
+        stop: int | None = None,
+        columns: list[str] | None = None,
+        encoding: str | None = None,
+    ) -> list:
+        """Parse data rows [start, stop) only, seeking to them through the
+        sidecar RowOffsetIndex (built on first use)."""
+        index = RowOffsetIndex.open(filename)
+        headers = next(csv.reader(read_csv_range(filename, *index.header_range, encoding)))
+        return self.parse_range(filename, headers, *index.byte_range(start, stop), columns, encoding)
+
+    def parse_parallel(
+        self,
+        filename: str,
+        max_workers: int | None = None,
+        columns: list[str] | None = None,
+        index: bool = False,
+        encoding: str | None = None,
+    ) -> list:
+        """Parse line-aligned chunks of the file in a process pool.
+
+        Records come back in file order. The parser (and its column types or
+        class) must be picklable, so use builtins or module-level names.
+        """
+        max_workers = max_workers or os.cpu_count()
+        headers, ranges = split_csv(filename, max_workers, index, encoding)
+        starts, ends = zip(*ranges) if ranges else ((), ())
+        records = []
+        with ProcessPoolExecutor(max_workers) as pool:
+            chunks = pool.map(
+                self.parse_range,
+                repeat(filename), repeat(headers), starts, ends, repeat(columns), repeat(encoding),
+            )
+            for chunk in chunks:
+                records.extend(chunk)
+        return records
+
     @abstractmethod
     def make_record(self, headers, row):
         pass
@@ -41,42 +184,95 @@ class InstanceCsvParser(CSVParser):
 
 
 class DataCollection(collections.abc.Sequence):
-    def __init__(self, columns: list[str]) -> None:
-        self.columns = {col_name: list() for col_name in columns}
+    def __init__(self, columns: list[str], types: list | None = None) -> None:
+        types = types or [None] * len(columns)
+        self.columns = {
+            col_name: make_column(col_type) for col_name, col_type in zip(columns, types)
+        }
+
+    @classmethod
+    def from_columns(cls, columns: dict) -> "DataCollection":
+        data_collection = cls([])
+        data_collection.columns = dict(columns)
+        return data_collection
 
     def __len__(self):
         return len(list(self.columns.values())[0])
 
-    def __getitem__(self, index) -> dict:
-        data = {col: values[index] for col, values in self.columns.items()}
-        if len(list(data.values())[0]) == 1:
-            return data
-        else:
-            header = self.columns.keys()
-            records = []
-            values = zip(*data.values())
-            for i in values:
-                record = {name: val for name, val in zip(header, i)}
-                records.append(record)
-            return records
-    
+    def __getitem__(self, index) -> dict | list[dict]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return {col: values[index] for col, values in self.columns.items()}
+
     def append(self, values: dict):
         for key, value in values.items():
             self.columns[key].append(value)
 
+    def extend(self, columns: dict[str, list]):
+        for key, values in columns.items():
+            self.columns[key].extend(values)
+
+    def rows_where(self, column: str, value) -> list[dict]:
+        values = self.columns[column]
+        if isinstance(values, CategoricalColumn):
+            indices = values.indices_of(value)
+        else:
+            indices = [i for i, v in enumerate(values) if v == value]
+        return [self[i] for i in indices]
+
+    def indices_between(self, column: str, low, high) -> list[int]:
+        """Row indices with low <= value <= high, e.g. an mdy_date range."""
+        values = self.columns[column]
+        return list(compress(count(), (low <= value <= high for value in values)))
 
-def read_csv_as_dicts(filename: str, column_types: list) -> list[dict]:
+    def derive(self, name: str, source: str, func) -> None:
+        """Add a categorical column holding func(value) for each value of source."""
+        column = self.columns[source]
+        if not isinstance(column, CategoricalColumn):
+            column = CategoricalColumn(column)
+        self.columns[name] = column.map_categories(func)
+
+    def group_by(self, *keys: str) -> GroupBy:
+        return GroupBy(self, keys)
+
+
+def read_csv_as_dicts(
+    filename: str,
+    column_types: list,
+    columns: list[str] | None = None,
+    rows: slice | None = None,
+    encoding: str | None = None,
+) -> list[dict]:
+    """Read a CSV file into a list of dicts, or only rows[start:stop] of it."""
     parser = DictCSVParser(column_types)
-    return parser.parse(filename=filename)
+    if rows is not None:
+        return parser.parse_rows(filename, *row_bounds(rows), columns, encoding)
+    return parser.parse(filename=filename, columns=columns, encoding=encoding)
 
 
-def read_csv_as_columns(filepath: str, column_types: list) -> DataCollection:
+def read_csv_as_columns(
+    filepath: str,
+    column_types: list,
+    cache: bool = False,
+    columns: list[str] | None = None,
+    encoding: str | None = None,
+) -> DataCollection:
+    """Read a CSV file into a DataCollection.
 
-    with open(filepath) as f:
+    If columns is given, only those columns are converted and stored and
+    column_types lists the conversion for each of them. With cache=True the
+    columns are cached (see colcache) unless a converter is a lambda or
+    local function, a column holds values colcache can't store or the
+    sidecar can't be written.
+    """
+    with open_text(filepath, encoding) as f:
         csv_file = csv.reader(f)
-        header = next(csv_file)
+        header, csv_file = select_columns(next(csv_file), csv_file, columns)
 
-        data_collection = DataCollection(header)
+        if cache and (cached := colcache.load_columns(filepath, column_types, header)):
+            return DataCollection.from_columns(cached)
+
+        data_collection = DataCollection(header, column_types)
 
         for row in csv_file:
             record = {
@@ -86,18 +282,98 @@ def read_csv_as_columns(filepath: str, column_types: list) -> DataCollection:
             }
             data_collection.append(record)
 
+    if cache:
+        try:
+            colcache.save_columns(filepath, column_types, data_collection.columns)
+        except (TypeError, OSError):
+            pass  # Unstorable column or no writable sidecar, read uncached
     return data_collection
 
 
-def read_csv_as_instances(filename: str, cls: object) -> list[object]:
+def read_csv_as_instances(
+    filename: str,
+    cls: object,
+    columns: list[str] | None = None,
+    rows: slice | None = None,
+    encoding: str | None = None,
+) -> list[object]:
     parser = InstanceCsvParser(cls)
-    return parser.parse(filename=filename)
+    if rows is not None:
+        return parser.parse_rows(filename, *row_bounds(rows), columns, encoding)
+    return parser.parse(filename=filename, columns=columns, encoding=encoding)
+
+
+def read_columns_range(
+    filename: str,
+    headers: list[str],
+    column_types: list,
+    start: int,
+    end: int,
+    columns: list[str] | None = None,
+    encoding: str | None = None,
+) -> dict[str, list]:
+    rows = csv.reader(read_csv_range(filename, start, end, encoding))
+    headers, rows = select_columns(headers, rows, columns)
+    data = {name: [] for name in headers}
+    for row in rows:
+        for name, func, val in zip(headers, column_types, row):
+            data[name].append(func(val))
+    return data
+
+
+def read_csv_as_dicts_parallel(
+    filename: str,
+    column_types: list,
+    max_workers: int | None = None,
+    columns: list[str] | None = None,
+    index: bool = False,
+    encoding: str | None = None,
+) -> list[dict]:
+    parser = DictCSVParser(column_types)
+    return parser.parse_parallel(filename, max_workers, columns, index, encoding)
+
+
+def read_csv_as_instances_parallel(
+    filename: str,
+    cls: object,
+    max_workers: int | None = None,
+    columns: list[str] | None = None,
+    index: bool = False,
+    encoding: str | None = None,
+) -> list[object]:
+    parser = InstanceCsvParser(cls)
+    return parser.parse_parallel(filename, max_workers, columns, index, encoding)
+
+
+def read_csv_as_columns_parallel(
+    filepath: str,
+    column_types: list,
+    max_workers: int | None = None,
+    columns: list[str] | None = None,
+    index: bool = False,
+    encoding: str | None = None,
+) -> DataCollection:
+    max_workers = max_workers or os.cpu_count()
+    headers, ranges = split_csv(filepath, max_workers, index, encoding)
+    starts, ends = zip(*ranges) if ranges else ((), ())
+
+    data_collection = DataCollection(columns or headers, column_types)
+    with ProcessPoolExecutor(max_workers) as pool:
+        chunks = pool.map(
+            read_columns_range,
+            repeat(filepath), repeat(headers), repeat(column_types), starts, ends, repeat(columns),
+            repeat(encoding),
+        )
+        for columns in chunks:
+            data_collection.extend(columns)
+
+    return data_collection
 
 
 if __name__ == "__main__":
     from pathlib import Path
     path = Path(__file__).parent.parent.parent
-    data = read_csv_as_columns(path /"Data/ctabus.csv", [str, str, str, int])
+    data = read_csv_as_columns(path /"Data/ctabus.csv", [category, category, category, int])
     len(data)
     data[0]
     data[0:3]
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+from .columns import category, mdy_date, year_of_days
+from .reader import DataCollection, read_csv_as_columns
+
+DATA_PATH = Path(__file__).parent.parent.parent / "Data/ctabus.csv"
+RIDE_TYPES = [category, mdy_date, category, int]
+
+
+def load_rides(filename: str | Path = DATA_PATH, cache: bool = False, year: bool = True) -> DataCollection:
+    """Read ctabus.csv columns (dates as days since the epoch), deriving a
+    year column unless year=False."""
+    data = read_csv_as_columns(filename, RIDE_TYPES, cache=cache)
+    if year:
+        data.derive("year", "date", year_of_days)
+    return data
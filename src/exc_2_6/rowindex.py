@@ -0,0 +1,114 @@
+"""Sidecar index of CSV record offsets, e.g. ctabus.csv.row_offsets.colcache.
+
+Built once with a single scan of the file, it lets readers jump straight to
+row N or to a range of rows, and split a file into shards of equal row count,
+without rescanning the prefix of the file.
+"""
+import mmap
+from array import array
+from pathlib import Path
+
+from ..compressed import compressed_opener
+from . import colcache
+
+BLOCK_SIZE = 1 << 20
+ROW_OFFSETS_TAG = "row_offsets"
+
+
+def scan_line_offsets(buffer, block_size: int = BLOCK_SIZE) -> array:
+    """Start offset of every CSV record in buffer, plus the buffer size.
+
+    Newlines inside quoted fields don't start a record. Blocks without any
+    quote character take a fast path that only splits on newlines.
+    """
+    size = len(buffer)
+    offsets = array("Q", [0])
+    in_quotes = False
+    pos = 0
+    while pos < size:
+        newline = buffer.find(b"\n", min(pos + block_size, size) - 1)
+        end = size if newline == -1 else newline + 1
+        block = buffer[pos:end]
+        if not in_quotes and b'"' not in block:
+            start = pos
+            for line in block.split(b"\n")[:-1]:
+                start += len(line) + 1
+                offsets.append(start)
+        else:
+            last = 0
+            newline = block.find(b"\n")
+            while newline != -1:
+                in_quotes ^= block.count(b'"', last, newline) % 2 == 1
+                last = newline + 1
+                if not in_quotes:
+                    offsets.append(pos + last)
+                newline = block.find(b"\n", last)
+            in_quotes ^= block.count(b'"', last) % 2 == 1
+        pos = end
+    if offsets[-1] != size:
+        offsets.append(size)
+    return offsets
+
+
+class RowOffsetIndex:
+    """Byte offsets of the header and data rows of a CSV file.
+
+    offsets[0] is the start of the header, offsets[n + 1] the start of data
+    row n and offsets[-1] the file size. Files under 4 GiB store 4-byte
+    offsets in the sidecar.
+    """
+
+    def __init__(self, offsets) -> None:
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 2
+
+    @property
+    def header_range(self) -> tuple[int, int]:
+        return self.offsets[0], self.offsets[1]
+
+    def byte_range(self, start: int, stop: int | None = None) -> tuple[int, int]:
+        """The (start, end) byte range holding data rows [start, stop)."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        return self.offsets[start + 1], self.offsets[stop + 1]
+
+    def split(self, nchunks: int) -> list[tuple[int, int]]:
+        """Byte ranges of at most nchunks shards with (nearly) equal row counts."""
+        nrows = len(self)
+        bounds = sorted({nrows * i // nchunks for i in range(nchunks + 1)})
+        return [self.byte_range(start, stop) for start, stop in zip(bounds, bounds[1:])]
+
+    @classmethod
+    def build(cls, source: str | Path) -> "RowOffsetIndex":
+        if compressed_opener(source):
+            raise ValueError(f"{source} is compressed, byte offsets need a plain file")
+        with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return cls(scan_line_offsets(buffer))
+
+    def save(self, source: str | Path) -> Path:
+        """Persist the offsets next to source (see colcache)."""
+        offsets = self.offsets
+        if offsets[-1] < 1 << 32:
+            offsets = array("I", offsets)
+        return colcache.save_columns(source, [], {"offsets": offsets}, tag=ROW_OFFSETS_TAG)
+
+    @classmethod
+    def load(cls, source: str | Path) -> "RowOffsetIndex | None":
+        """The saved index of source, or None if it is missing or stale."""
+        columns = colcache.load_columns(source, [], ["offsets"], tag=ROW_OFFSETS_TAG)
+        return None if columns is None else cls(columns["offsets"])
+
+    @classmethod
+    def open(cls, source: str | Path) -> "RowOffsetIndex":
+        """Load the saved index of source, building and saving it if needed
+        (an index that can't be saved is still returned)."""
+        index = cls.load(source)
+        if index is None:
+            index = cls.build(source)
+            try:
+                index.save(source)
+            except OSError:
+                pass
+        return index
@@ -0,0 +1,47 @@
+import heapq
+from itertools import count
+
+
+class TopK:
+    """Streaming top-k: keep the k largest items seen so far in a min-heap.
+
+    Memory is O(k) and each push is O(log k), so it can sit at the end of a
+    generator pipeline over any number of items.
+    """
+
+    def __init__(self, k: int, key=None) -> None:
+        self.k = k
+        self.key = key
+        self._heap = []
+        self._order = count()
+
+    def push(self, item) -> None:
+        if self.k <= 0:
+            return
+        rank = item if self.key is None else self.key(item)
+        # The counter breaks ties so the items themselves are never compared
+        entry = (rank, -next(self._order), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def extend(self, items) -> None:
+        for item in items:
+            self.push(item)
+
+    def result(self) -> list:
+        """The items kept, largest first."""
+        return [item for _, _, item in sorted(self._heap, reverse=True)]
+
+
+def top_k(items, k: int, key=None) -> list:
+    """The k largest items of an iterable, largest first."""
+    topk = TopK(k, key)
+    topk.extend(items)
+    return topk.result()
+
+
+def most_common(counts: dict, k: int) -> list[tuple]:
+    """The k (key, count) pairs with the largest counts, like Counter.most_common."""
+    return top_k(counts.items(), k, key=lambda item: item[1])